@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
 from reader import Reader
 
@@ -10,8 +10,58 @@ class GenomicDataReader(Reader, ABC):
     """
     Абстрактный ридер геномных данных (sam/vcf).
     Наследуется от Reader.
+
+    Атрибуты класса
+    ---------------
+    _chrom_column: int
+        Номер колонки (с нуля) с названием хромосомы в строке записи.
+        Используется для быстрого разбиения файла по хромосомам
+        без полного разбора строк.
+    _header_prefix: bytes
+        Начало заголовочных строк, которые пропускаются при разбиении
+        файла по хромосомам ('#' для VCF, '@' для SAM).
+    _has_index: bool
+        True, если chromosome_ranges() берёт диапазоны из индекса файла,
+        а не из последовательного прохода по нему.
     """
 
+    _chrom_column: int = 0
+    _header_prefix: bytes = b"#"
+    _has_index: bool = False
+
+    def chromosome_ranges(self) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        Найти непрерывные блоки записей каждой хромосомы.
+
+        Возвращает словарь {хромосома: [(start, end), ...]} с диапазонами
+        байтов, пригодными для read_range(). Для отсортированного файла
+        у каждой хромосомы ровно один блок. Строки только разрезаются по
+        колонке _chrom_column, без полного разбора, но это всё равно
+        один последовательный проход по файлу.
+        """
+        column = self._chrom_column
+        prefix = self._header_prefix
+        blocks: Dict[str, List[Tuple[int, int]]] = {}
+        current: Optional[str] = None
+        block_start = 0
+        offset = 0
+        with open(self._filename, "rb") as handle:
+            for raw in handle:
+                fields = raw.rstrip(b"\r\n").split(b"\t", column + 1)
+                if raw.startswith(prefix) or len(fields) <= column:
+                    offset += len(raw)
+                    continue
+                chrom = fields[column].decode("utf-8")
+                if chrom != current:
+                    if current is not None:
+                        blocks.setdefault(current, []).append((block_start, offset))
+                    current = chrom
+                    block_start = offset
+                offset += len(raw)
+        if current is not None:
+            blocks.setdefault(current, []).append((block_start, offset))
+        return blocks
+
     @abstractmethod
     def get_chromosomes(self) -> List[str]:
         """
@@ -0,0 +1,250 @@
+# ParallelExecutor.py
+from __future__ import annotations
+
+import os
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from GenomicDataReader import GenomicDataReader
+
+
+ByteRange = Tuple[int, int]
+MapFunc = Callable[[Iterable[Dict[str, Any]]], Any]
+ReduceFunc = Callable[[Any, Any], Any]
+
+
+# ---------- Встроенные map-функции ----------
+
+def _record_chrom(record: Dict[str, Any]) -> str:
+    """
+    Название хромосомы записи: поле RNAME для SAM, CHROM для VCF.
+    """
+    if "RNAME" in record:
+        return record["RNAME"]
+    return record["CHROM"]
+
+
+def count_by_chromosome(
+    records: Iterable[Dict[str, Any]], include_unmapped: bool = False
+) -> Dict[str, int]:
+    """
+    Количество записей (выравниваний или вариантов) по хромосомам.
+    Невыровненные записи (RNAME '*') учитываются под ключом '*',
+    только если include_unmapped истинно.
+    """
+    counts: Dict[str, int] = {}
+    for record in records:
+        chrom = _record_chrom(record)
+        if chrom == "*" and not include_unmapped:
+            continue
+        counts[chrom] = counts.get(chrom, 0) + 1
+    return counts
+
+
+def coverage_by_chromosome(
+    records: Iterable[Dict[str, Any]], chrom: Optional[str] = None
+) -> Dict[str, Dict[int, int]]:
+    """
+    Покрытие в том же смысле, что и SamReader.calculate_coverage:
+    число начал выравниваний в каждой позиции, по каждой хромосоме.
+
+    Если chrom задан, учитываются только выравнивания на этой хромосоме.
+    """
+    coverage: Dict[str, Dict[int, int]] = {}
+    for aln in records:
+        rname = aln["RNAME"]
+        if rname == "*" or (chrom is not None and rname != chrom):
+            continue
+        per_chrom = coverage.setdefault(rname, {})
+        pos = aln["POS"]
+        per_chrom[pos] = per_chrom.get(pos, 0) + 1
+    return coverage
+
+
+def quality_passed(
+    records: Iterable[Dict[str, Any]], min_qual: float
+) -> List[Dict[str, Any]]:
+    """
+    Варианты с QUAL не ниже min_qual (аналог VcfReader.filter_by_quality).
+    """
+    return [
+        var for var in records
+        if var["QUAL"] is not None and var["QUAL"] >= min_qual
+    ]
+
+
+# ---------- Встроенные reduce-функции ----------
+
+def merge_counts(left: Any, right: Any) -> Any:
+    """
+    Сложить два результата map-функции.
+
+    Числа складываются, словари объединяются по ключам с рекурсивным
+    сложением значений, списки конкатенируются.
+    """
+    if isinstance(left, dict) and isinstance(right, dict):
+        merged = dict(left)
+        for key, value in right.items():
+            merged[key] = merge_counts(merged[key], value) if key in merged else value
+        return merged
+    return left + right
+
+
+# ---------- Исполнитель ----------
+
+def _run_task(
+    reader_cls: type, filename: str, byte_range: ByteRange, map_func: MapFunc
+) -> Any:
+    """
+    Выполнить map-функцию над одним диапазоном файла.
+    Вынесено на уровень модуля, чтобы задачу можно было передать в процесс.
+    """
+    reader = reader_cls(filename)
+    start, end = byte_range
+    return map_func(reader.read_range(start, end))
+
+
+class ParallelExecutor:
+    """
+    Параллельный map-reduce над ридером геномных данных (SAM/VCF).
+
+    Файл разбивается на диапазоны байтов, выровненные по границам строк:
+    либо по хромосомам (для отсортированных файлов каждая хромосома –
+    непрерывный блок), либо на куски примерно равного размера. Каждый
+    диапазон обрабатывается map-функцией в пуле процессов, результаты
+    сворачиваются reduce-функцией.
+
+    map-функция получает итератор по записям ридера и должна быть
+    определена на уровне модуля (или быть functools.partial от такой
+    функции), чтобы её можно было передать в дочерний процесс.
+    """
+
+    def __init__(
+        self,
+        reader: GenomicDataReader,
+        processes: Optional[int] = None,
+        chunk_size: int = 64 * 1024 * 1024,
+    ) -> None:
+        self._reader = reader
+        self._processes = processes or os.cpu_count() or 1
+        self._chunk_size = chunk_size
+
+    # ---------- Разбиение файла ----------
+
+    def split_by_bytes(self) -> List[ByteRange]:
+        """
+        Разбить файл на диапазоны байтов примерно одинакового размера.
+
+        Число диапазонов – не меньше числа процессов, размер – не больше
+        chunk_size. Границы могут попадать в середину записи: read_range
+        ридера сам выравнивает их по границам строк (или блоков).
+        """
+        size = os.path.getsize(self._reader._filename)
+        if size == 0:
+            return []
+        n_chunks = max(self._processes, -(-size // self._chunk_size))
+        bounds = [size * i // n_chunks for i in range(n_chunks + 1)]
+        return [
+            (start, end) for start, end in zip(bounds, bounds[1:]) if start < end
+        ]
+
+    def split_by_chromosome(self) -> Dict[str, List[ByteRange]]:
+        """
+        Диапазоны байтов каждой хромосомы: {хромосома: [(start, end), ...]}.
+        Разбиение выполняет сам ридер (GenomicDataReader.chromosome_ranges).
+        """
+        return self._reader.chromosome_ranges()
+
+    # ---------- Map-reduce ----------
+
+    def map_reduce(
+        self,
+        map_func: MapFunc,
+        reduce_func: ReduceFunc = merge_counts,
+        initial: Any = None,
+        ranges: Optional[List[ByteRange]] = None,
+    ) -> Any:
+        """
+        Применить map_func к каждому диапазону и свернуть результаты.
+
+        ranges – список диапазонов байтов; по умолчанию split_by_bytes().
+        initial – начальное значение свёртки; если не задано, первым
+        значением становится результат первого диапазона.
+        При processes == 1 пул не создаётся и всё выполняется в текущем
+        процессе.
+        """
+        if ranges is None:
+            ranges = self.split_by_bytes()
+
+        task = partial(
+            _run_task, type(self._reader), self._reader._filename, map_func=map_func
+        )
+        if self._processes == 1 or len(ranges) <= 1:
+            partials = map(task, ranges)
+            return self._reduce(partials, reduce_func, initial)
+
+        # пул процессов импортируется только когда он действительно нужен
+        from concurrent.futures import ProcessPoolExecutor
+
+        workers = min(self._processes, len(ranges))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return self._reduce(pool.map(task, ranges), reduce_func, initial)
+
+    @staticmethod
+    def _reduce(partials: Iterable[Any], reduce_func: ReduceFunc, initial: Any) -> Any:
+        result = initial
+        for value in partials:
+            result = value if result is None else reduce_func(result, value)
+        return result
+
+    # ---------- Готовые статистики ----------
+
+    def count_by_chromosome(self, include_unmapped: bool = False) -> Dict[str, int]:
+        """
+        Количество записей по хромосомам (см. функцию count_by_chromosome).
+        """
+        return self.map_reduce(
+            partial(count_by_chromosome, include_unmapped=include_unmapped),
+            initial={},
+        )
+
+    def get_chromosomes(self) -> List[str]:
+        """
+        Параллельный аналог get_chromosomes() ридера.
+        """
+        return sorted(self.count_by_chromosome())
+
+    def calculate_coverage(self, chrom: str) -> Dict[int, int]:
+        """
+        Параллельный аналог SamReader.calculate_coverage.
+
+        Если у ридера есть индекс (SamBinaryReader), обрабатываются только
+        блоки указанной хромосомы, при необходимости порезанные на куски
+        chunk_size. Текстовый файл режется на куски split_by_bytes():
+        поиск границ хромосомы потребовал бы последовательного прохода
+        по всему файлу ещё до запуска процессов, а map-функция и так
+        отбрасывает чужие хромосомы.
+        """
+        ranges: Optional[List[ByteRange]] = None
+        if self._reader._has_index:
+            ranges = []
+            for start, end in self.split_by_chromosome().get(chrom, []):
+                for chunk_start in range(start, end, self._chunk_size):
+                    ranges.append((chunk_start, min(chunk_start + self._chunk_size, end)))
+        result = self.map_reduce(
+            partial(coverage_by_chromosome, chrom=chrom), initial={}, ranges=ranges
+        )
+        return result.get(chrom, {})
+
+    def calculate_genome_coverage(self) -> Dict[str, Dict[int, int]]:
+        """
+        Покрытие (число начал выравниваний) по всем хромосомам сразу.
+        """
+        return self.map_reduce(coverage_by_chromosome, initial={})
+
+    def filter_by_quality(self, min_qual: float) -> List[Dict[str, Any]]:
+        """
+        Параллельный аналог VcfReader.filter_by_quality.
+        Порядок вариантов совпадает с порядком в файле.
+        """
+        return self.map_reduce(partial(quality_passed, min_qual=min_qual), initial=[])
@@ -0,0 +1,210 @@
+# SamBinaryWriter.py
+from __future__ import annotations
+
+import struct
+import zlib
+from typing import Any, Dict, Iterable, List, Tuple
+
+from SamReader import SamReader
+from sam_binary_format import (
+    BLOCK_HEADER,
+    BLOCK_INDEX_ENTRY,
+    FILE_HEADER,
+    MAGIC,
+    RECORD,
+    REF_NONE,
+    REF_SAME,
+    U32,
+    U64,
+    encode_cigar,
+    encode_seq,
+)
+
+
+class SamBinaryWriter:
+    """
+    Запись выравниваний SamReader в компактный бинарный формат
+    (описание формата – в модуле sam_binary_format).
+
+    Записи группируются в блоки примерно по block_size байт. По умолчанию
+    блоки не сжимаются: распаковка zlib стоит при чтении больше, чем
+    разбор колонок, а SEQ и так упакована по 4 бита на основание. При
+    compression_level > 0 каждый блок сжимается zlib – файл меньше
+    примерно в 2,2 раза, но чтение медленнее. В конце файла пишется
+    индекс блоков с диапазоном ref_id каждого блока, по которому
+    SamBinaryReader пропускает лишние блоки при выборке по хромосоме.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        block_size: int = 64 * 1024,
+        compression_level: int = 0,
+    ) -> None:
+        self._filename = filename
+        self._block_size = block_size
+        self._compression_level = compression_level
+
+    def write(self, reader: SamReader) -> int:
+        """
+        Сконвертировать SAM-файл ридера целиком.
+        Возвращает число записанных выравниваний.
+        """
+        header = reader.get_header()
+        header_lines = [line for lines in header.values() for line in lines]
+        return self.write_alignments(reader.read(), header_lines)
+
+    def write_alignments(
+        self, alignments: Iterable[Dict[str, Any]], header_lines: List[str]
+    ) -> int:
+        """
+        Записать выравнивания (словари в формате SamReader) и заголовок.
+        Возвращает число записанных выравниваний.
+        """
+        refs = self._refs_from_header(header_lines)
+        ref_ids = {name: idx for idx, name in enumerate(refs)}
+        index: List[Tuple[int, int, int, int]] = []
+        total = 0
+
+        def ref_id(name: str) -> int:
+            if name == "*":
+                return REF_NONE
+            if name not in ref_ids:
+                ref_ids[name] = len(refs)
+                refs.append(name)
+            return ref_ids[name]
+
+        with open(self._filename, "wb") as handle:
+            header_bytes = "\n".join(header_lines).encode("utf-8")
+            handle.write(MAGIC)
+            handle.write(FILE_HEADER.pack(1 if self._compression_level > 0 else 0))
+            handle.write(U32.pack(len(header_bytes)))
+            handle.write(header_bytes)
+
+            block = _Block()
+            for aln in alignments:
+                rid = ref_id(aln["RNAME"])
+                rnext = aln["RNEXT"]
+                if rnext == "=":
+                    next_rid = REF_SAME
+                else:
+                    next_rid = ref_id(rnext)
+                block.add(aln, rid, next_rid)
+
+                if block.size >= self._block_size:
+                    index.append(self._flush(handle, block))
+                    total += block.n_records
+                    block = _Block()
+
+            if block.n_records:
+                index.append(self._flush(handle, block))
+                total += block.n_records
+
+            index_offset = handle.tell()
+            handle.write(U32.pack(len(refs)))
+            for name in refs:
+                name_bytes = name.encode("utf-8")
+                handle.write(U32.pack(len(name_bytes)))
+                handle.write(name_bytes)
+            handle.write(U32.pack(len(index)))
+            for entry in index:
+                handle.write(BLOCK_INDEX_ENTRY.pack(*entry))
+            handle.write(U64.pack(index_offset))
+            handle.write(MAGIC)
+        return total
+
+    # ---------- Вспомогательные методы ----------
+
+    @staticmethod
+    def _refs_from_header(header_lines: List[str]) -> List[str]:
+        """
+        Названия референсов из строк @SQ (поле SN:) в порядке заголовка.
+        """
+        refs: List[str] = []
+        for line in header_lines:
+            if not line.startswith("@SQ"):
+                continue
+            for field in line.split("\t")[1:]:
+                if field.startswith("SN:"):
+                    refs.append(field[3:])
+        return refs
+
+    def _flush(self, handle, block: "_Block") -> Tuple[int, int, int, int]:
+        """
+        Записать блок в файл и вернуть его запись для индекса.
+        """
+        offset = handle.tell()
+        raw = block.payload()
+        payload = raw
+        if self._compression_level > 0:
+            payload = zlib.compress(raw, self._compression_level)
+        handle.write(BLOCK_HEADER.pack(len(raw), len(payload)))
+        handle.write(payload)
+        return offset, block.n_records, block.min_ref, block.max_ref
+
+
+class _Block:
+    """
+    Накопитель колонок одного блока (раскладка – в sam_binary_format).
+    """
+
+    def __init__(self) -> None:
+        self.n_records = 0
+        self.size = 0
+        self.min_ref = 0
+        self.max_ref = 0
+        self._fixed = bytearray()
+        self._qnames: List[str] = []
+        self._cigars: List[int] = []
+        self._seqs: List[str] = []
+        self._quals: List[str] = []
+        self._tags: List[str] = []
+
+    def add(self, aln: Dict[str, Any], rid: int, next_rid: int) -> None:
+        cigar = encode_cigar(aln["CIGAR"])
+        seq = aln["SEQ"] if aln["SEQ"] != "*" else ""
+        tags = "\t".join(aln["TAGS"])
+
+        self._fixed += RECORD.pack(
+            aln["FLAG"],
+            rid,
+            aln["POS"],
+            aln["MAPQ"],
+            next_rid,
+            aln["PNEXT"],
+            aln["TLEN"],
+            len(cigar),
+            len(seq),
+        )
+        self._qnames.append(aln["QNAME"])
+        self._cigars.extend(cigar)
+        # дополнение до чётной длины, чтобы каждая последовательность
+        # начиналась с целого байта
+        self._seqs.append(seq + "=" if len(seq) % 2 else seq)
+        self._quals.append(aln["QUAL"])
+        self._tags.append(tags)
+
+        if self.n_records == 0:
+            self.min_ref = self.max_ref = rid
+        else:
+            self.min_ref = min(self.min_ref, rid)
+            self.max_ref = max(self.max_ref, rid)
+        self.n_records += 1
+        self.size += (
+            RECORD.size + len(aln["QNAME"]) + 4 * len(cigar)
+            + len(seq) // 2 + len(aln["QUAL"]) + len(tags)
+        )
+
+    def payload(self) -> bytes:
+        sections = [
+            "\n".join(self._qnames).encode("utf-8"),
+            struct.pack(f"<{len(self._cigars)}I", *self._cigars),
+            encode_seq("".join(self._seqs)),
+            "\n".join(self._quals).encode("ascii"),
+            "\n".join(self._tags).encode("utf-8"),
+        ]
+        parts = [U32.pack(self.n_records), bytes(self._fixed)]
+        for section in sections:
+            parts.append(U32.pack(len(section)))
+            parts.append(section)
+        return b"".join(parts)
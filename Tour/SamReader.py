@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Iterator, List, Optional
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from GenomicDataReader import GenomicDataReader
 
@@ -12,6 +13,11 @@ class SamReader(GenomicDataReader):
     Выравнивание представляется словарём с основными полями SAM.
     """
 
+    _chrom_column = 2
+    _header_prefix = b"@"
+
+    _CIGAR_RE = re.compile(r"(\d+)([MIDNSHP=X])")
+
     # ---------- Реализация абстрактного интерфейса Reader ----------
 
     def _parse_line(self, line: str) -> Optional[Dict[str, Any]]:
@@ -90,6 +96,20 @@ class SamReader(GenomicDataReader):
             coverage[pos] = coverage.get(pos, 0) + 1
         return coverage
 
+    @staticmethod
+    def parse_cigar(cigar: str) -> List[Tuple[int, str]]:
+        """
+        Разобрать строку CIGAR в список операций (длина, операция).
+        Для '*' возвращается пустой список, для некорректной строки
+        выбрасывается ValueError.
+        """
+        if cigar == "*":
+            return []
+        ops = SamReader._CIGAR_RE.findall(cigar)
+        if not ops or sum(len(length) + 1 for length, _ in ops) != len(cigar):
+            raise ValueError(f"Некорректная строка CIGAR: {cigar!r}")
+        return [(int(length), op) for length, op in ops]
+
     # ---------- Реализация абстрактного интерфейса GenomicDataReader ----------
 
     def get_chromosomes(self) -> List[str]:
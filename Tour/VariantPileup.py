@@ -0,0 +1,315 @@
+# VariantPileup.py
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from SamReader import SamReader
+from VcfReader import VcfReader
+
+
+# Операции CIGAR, сдвигающие позицию в референсе и/или в прочтении
+_CONSUMES_REF = set("MDN=X")
+_CONSUMES_READ = set("MIS=X")
+
+# По умолчанию пропускаются невыровненные, вторичные, не прошедшие
+# контроль качества и дублированные прочтения (как в samtools mpileup)
+DEFAULT_SKIP_FLAGS = 0x4 | 0x100 | 0x200 | 0x400
+
+
+class _ActiveAlignment:
+    """
+    Выравнивание в активном окне: разобранный CIGAR и координаты,
+    вычисленные один раз при добавлении в окно.
+    """
+
+    __slots__ = ("start", "end", "cigar", "seq", "qual")
+
+    def __init__(self, aln: Dict[str, Any]) -> None:
+        self.start: int = aln["POS"]
+        self.cigar = SamReader.parse_cigar(aln["CIGAR"])
+        ref_len = sum(length for length, op in self.cigar if op in _CONSUMES_REF)
+        self.end: int = self.start + ref_len - 1
+        self.seq: str = aln["SEQ"]
+        self.qual: str = aln["QUAL"]
+
+    def read_allele(
+        self, start: int, end: int, trailing_insertion: bool
+    ) -> Optional[Tuple[str, Optional[int]]]:
+        """
+        Последовательность прочтения, выровненная на участок референса
+        [start, end], включая вставки внутри участка. Вставка сразу после
+        позиции end учитывается, только если trailing_insertion истинно
+        (вариант – вставка).
+
+        Возвращает (аллель, качество основания в позиции start) или None,
+        если прочтение не покрывает участок целиком. Если позиция start
+        попадает в делецию или QUAL равно '*', качество равно None.
+        """
+        if self.start > start or self.end < end or self.seq == "*":
+            return None
+
+        ref_pos = self.start
+        read_idx = 0
+        bases: List[str] = []
+        base_qual: Optional[int] = None
+        last_insert = end + 1 if trailing_insertion else end
+        for length, op in self.cigar:
+            if ref_pos > end and op != "I":
+                break
+            if op in ("M", "=", "X"):
+                lo = max(ref_pos, start)
+                hi = min(ref_pos + length - 1, end)
+                if lo <= hi:
+                    first = read_idx + lo - ref_pos
+                    bases.append(self.seq[first:first + hi - lo + 1])
+                    if lo == start and first < len(self.qual) and self.qual != "*":
+                        base_qual = ord(self.qual[first]) - 33
+                ref_pos += length
+                read_idx += length
+            elif op == "I":
+                if start < ref_pos <= last_insert:
+                    bases.append(self.seq[read_idx:read_idx + length])
+                read_idx += length
+            elif op in _CONSUMES_REF:
+                ref_pos += length
+            elif op in _CONSUMES_READ:
+                read_idx += length
+        return "".join(bases), base_qual
+
+
+class VariantPileup:
+    """
+    Потоковый подсчёт аллелей в позициях вариантов.
+
+    Варианты из VcfReader и выравнивания из SamReader (или любого его
+    наследника) читаются одновременно, как две отсортированные по
+    координате последовательности. Выравнивания, перекрывающие текущий
+    вариант, хранятся в активном окне; прошедшие выравнивания из него
+    удаляются, поэтому память ограничена глубиной покрытия, а не
+    размером файлов.
+
+    Каждый файл должен быть отсортирован по координате: записи одной
+    хромосомы идут подряд и по возрастанию POS (иначе ValueError).
+    Порядок хромосом берётся из строк @SQ SAM и ##contig VCF. Без них
+    хромосомы сравниваются только как «та же / другая», и при переходе
+    VCF на новую хромосому порядок известен, лишь если следующее
+    выравнивание стоит на ней же или на хромосоме, которую VCF уже
+    прошёл. Иначе выбрасывается ValueError – до того, как будет
+    выдан хотя бы один вариант новой хромосомы. ValueError
+    выбрасывается и тогда, когда порядок хромосом в VCF противоречит
+    заголовкам или порядку выравниваний в SAM.
+    """
+
+    def __init__(
+        self,
+        vcf_reader: VcfReader,
+        sam_reader: SamReader,
+        min_base_quality: int = 0,
+        min_mapq: int = 0,
+        skip_flags: int = DEFAULT_SKIP_FLAGS,
+    ) -> None:
+        self._vcf_reader = vcf_reader
+        self._sam_reader = sam_reader
+        self._min_base_quality = min_base_quality
+        self._min_mapq = min_mapq
+        self._skip_flags = skip_flags
+
+    def pileup(self) -> Iterator[Dict[str, Any]]:
+        """
+        Генератор по вариантам с подсчётом аллелей.
+
+        Для каждого варианта возвращается словарь:
+        {
+            "CHROM", "POS", "ID", "REF", "ALT",  # как в VcfReader
+            "DEPTH": int,             # учтённые прочтения
+            "REF_COUNT": int,         # прочтения с аллелью REF
+            "ALT_COUNTS": List[int],  # по одному числу на каждую ALT
+            "OTHER_COUNT": int,       # прочтения с иной аллелью
+        }
+        Прочтение учитывается, если оно покрывает весь REF и качество
+        его основания в позиции POS не ниже min_base_quality.
+
+        Если в SAM есть выравнивания на хромосоме, у которой нет вариантов
+        в VCF, порядок хромосом должен быть объявлен в @SQ или ##contig:
+        без него переход VCF через такую хромосому даёт ValueError.
+        """
+        ranks = self._header_ranks()
+        alignments = self._sorted(self._filtered_alignments(), "RNAME", "SAM")
+        lookahead = next(alignments, None)
+        active: List[_ActiveAlignment] = []
+        current: Optional[str] = None
+        # хромосомы, которые VCF уже прошёл
+        finished: Set[str] = set()
+        # хромосомы, пройденные VCF, пока выравнивания стояли на другой
+        # хромосоме: их выравнивания позже появиться не должны
+        starved: Set[str] = set()
+        # хромосомы, выравнивания которых пропущены по порядку из заголовков:
+        # вариантов на них VCF уже встретить не должен
+        skipped: Set[str] = set()
+
+        for var in self._sorted(self._vcf_reader.read(), "CHROM", "VCF"):
+            chrom = var["CHROM"]
+            pos = var["POS"]
+            if chrom != current:
+                if chrom in skipped or (
+                    current in ranks and chrom in ranks
+                    and ranks[chrom] < ranks[current]
+                ):
+                    raise ValueError(
+                        f"Порядок хромосом в VCF и SAM различается: "
+                        f"в VCF {chrom} идёт после {current}, "
+                        f"а в @SQ / ##contig – раньше"
+                    )
+                if current is not None:
+                    finished.add(current)
+                current = chrom
+                active = []
+
+                # пропустить выравнивания хромосом, стоящих до новой
+                while lookahead is not None and lookahead["RNAME"] != chrom:
+                    aln_chrom = lookahead["RNAME"]
+                    if aln_chrom in starved:
+                        raise ValueError(
+                            f"Порядок хромосом в VCF и SAM различается: "
+                            f"выравнивания {aln_chrom} идут после того, как VCF её прошёл"
+                        )
+                    if aln_chrom not in finished:
+                        if aln_chrom not in ranks or chrom not in ranks:
+                            raise ValueError(
+                                f"Не удаётся определить порядок хромосом {chrom} и "
+                                f"{aln_chrom}: объявите его в @SQ SAM или ##contig VCF"
+                            )
+                        if ranks[aln_chrom] > ranks[chrom]:
+                            break
+                        skipped.add(aln_chrom)
+                    lookahead = next(alignments, None)
+
+                if lookahead is None or lookahead["RNAME"] != chrom:
+                    starved.add(chrom)
+
+            # добавить в окно выравнивания, начинающиеся не позже варианта
+            while (
+                lookahead is not None
+                and lookahead["RNAME"] == chrom
+                and lookahead["POS"] <= pos
+            ):
+                state = _ActiveAlignment(lookahead)
+                if state.end >= pos:
+                    active.append(state)
+                lookahead = next(alignments, None)
+
+            # убрать выравнивания, закончившиеся до варианта
+            active = [state for state in active if state.end >= pos]
+
+            yield self._count_alleles(var, active)
+
+        # Хромосомы VCF без выравниваний могли быть пройдены из-за разного
+        # порядка хромосом в файлах: тогда их выравнивания стоят дальше.
+        # Проверка дочитывает SAM, только если такие хромосомы были.
+        while starved and lookahead is not None:
+            if lookahead["RNAME"] in starved:
+                raise ValueError(
+                    f"Порядок хромосом в VCF и SAM различается: "
+                    f"выравнивания {lookahead['RNAME']} идут после того, как VCF её прошёл "
+                    f"(объявите порядок хромосом в @SQ или ##contig)"
+                )
+            lookahead = next(alignments, None)
+
+    # ---------- Вспомогательные методы ----------
+
+    def _header_ranks(self) -> Dict[str, int]:
+        """
+        Порядок хромосом, объявленных в строках @SQ SAM и ##contig VCF.
+        """
+        ranks: Dict[str, int] = {}
+        for line in self._sam_reader.get_header().get("SQ", []):
+            for field in line.split("\t")[1:]:
+                if field.startswith("SN:"):
+                    ranks.setdefault(field[3:], len(ranks))
+        for line in self._vcf_reader.get_header()["meta"]:
+            if line.startswith("##contig=<"):
+                for field in line[len("##contig=<"):].rstrip(">").split(","):
+                    if field.startswith("ID="):
+                        ranks.setdefault(field[3:], len(ranks))
+        return ranks
+
+    @staticmethod
+    def _sorted(
+        records: Iterable[Dict[str, Any]], chrom_key: str, label: str
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Пропустить записи, проверяя сортировку файла: хромосомы идут
+        блоками без повторов, внутри блока POS не убывает.
+        """
+        seen: Set[str] = set()
+        current: Optional[str] = None
+        last_pos = 0
+        for record in records:
+            chrom = record[chrom_key]
+            pos = record["POS"]
+            if chrom != current:
+                if chrom in seen:
+                    raise ValueError(
+                        f"{label} не отсортирован: хромосома {chrom} встречается повторно"
+                    )
+                seen.add(chrom)
+                current = chrom
+            elif pos < last_pos:
+                raise ValueError(f"{label} не отсортирован: {chrom}:{pos}")
+            last_pos = pos
+            yield record
+
+    def _filtered_alignments(self) -> Iterator[Dict[str, Any]]:
+        """
+        Выравнивания, прошедшие фильтры по FLAG и MAPQ.
+        """
+        for aln in self._sam_reader.read():
+            if aln["FLAG"] & self._skip_flags or aln["RNAME"] == "*":
+                continue
+            if aln["MAPQ"] < self._min_mapq:
+                continue
+            yield aln
+
+    def _count_alleles(
+        self, var: Dict[str, Any], active: List[_ActiveAlignment]
+    ) -> Dict[str, Any]:
+        ref = var["REF"]
+        alts: List[str] = var["ALT"]
+        start = var["POS"]
+        end = start + len(ref) - 1
+
+        depth = 0
+        ref_count = 0
+        alt_counts = [0] * len(alts)
+        other_count = 0
+        trailing_insertion = any(len(alt) > len(ref) for alt in alts)
+        for state in active:
+            observed = state.read_allele(start, end, trailing_insertion)
+            if observed is None:
+                continue
+            allele, base_qual = observed
+            if base_qual is not None and base_qual < self._min_base_quality:
+                continue
+            depth += 1
+            allele = allele.upper()
+            if allele == ref.upper():
+                ref_count += 1
+                continue
+            for idx, alt in enumerate(alts):
+                if allele == alt.upper():
+                    alt_counts[idx] += 1
+                    break
+            else:
+                other_count += 1
+
+        return {
+            "CHROM": var["CHROM"],
+            "POS": var["POS"],
+            "ID": var["ID"],
+            "REF": ref,
+            "ALT": alts,
+            "DEPTH": depth,
+            "REF_COUNT": ref_count,
+            "ALT_COUNTS": alt_counts,
+            "OTHER_COUNT": other_count,
+        }
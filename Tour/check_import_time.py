@@ -0,0 +1,101 @@
+# check_import_time.py
+"""
+Проверка бюджета времени импорта для коротких запусков cli.py.
+
+Для каждого сценария (cli.py + модуль одного ридера) запускается
+отдельный интерпретатор с -X importtime. Время модулей, которые
+интерпретатор импортирует сам при старте, не учитывается. Берётся
+медиана по нескольким запускам.
+
+    python check_import_time.py [--budget-ms 25] [--runs 5]
+
+Код возврата 1, если бюджет превышен или загружена тяжёлая
+зависимость (pandas, matplotlib, numpy).
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import List, Optional, Sequence, Set, Tuple
+
+
+HEAVY_MODULES = ("pandas", "matplotlib", "numpy")
+
+SCENARIOS = {
+    "fasta": "import cli, FastaReader",
+    "fastq": "import cli, FastqReader",
+    "sam": "import cli, SamReader",
+    "sam-binary": "import cli, SamBinaryReader",
+    "vcf": "import cli, VcfReader",
+}
+
+
+def _importtime(code: str) -> List[Tuple[int, str, bool]]:
+    """
+    Запустить код с -X importtime и вернуть тройки
+    (накопленное время в мкс, имя модуля, модуль верхнего уровня).
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=here,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    entries: List[Tuple[int, str, bool]] = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # вложенные импорты выводятся с отступом и уже учтены в родителе
+        entries.append((int(cumulative), name.strip(), not name.startswith("  ")))
+    return entries
+
+
+def measure(code: str, runs: int) -> Tuple[float, List[str]]:
+    """
+    Медианное время импорта сценария в миллисекундах и список
+    загруженных тяжёлых зависимостей.
+    """
+    startup = {name for _, name, _ in _importtime("pass")}
+    totals = []
+    heavy: Set[str] = set()
+    for _ in range(runs):
+        entries = _importtime(code)
+        totals.append(sum(
+            us for us, name, top in entries if top and name not in startup
+        ))
+        heavy.update(
+            name for _, name, _ in entries if name.split(".")[0] in HEAVY_MODULES
+        )
+    return statistics.median(totals) / 1000, sorted(heavy)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=25.0)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    failed = False
+    for name, code in SCENARIOS.items():
+        elapsed, heavy = measure(code, args.runs)
+        status = "ok"
+        if elapsed > args.budget_ms:
+            status = "OVER BUDGET"
+            failed = True
+        if heavy:
+            status = f"heavy imports: {', '.join(heavy)}"
+            failed = True
+        print(f"{name:<12}{elapsed:8.1f} ms  {status}")
+
+    print(f"budget      {args.budget_ms:8.1f} ms")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
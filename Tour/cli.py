@@ -0,0 +1,307 @@
+# cli.py
+"""
+Командная строка для ридеров FASTA/FASTQ/SAM/VCF.
+
+    python cli.py stats    FILE [--processes N]
+    python cli.py fetch    FILE ID | CHROM[:START[-END]]
+    python cli.py filter   FILE [--min-length L] [--min-quality Q]
+                                [--flag F] [--min-mapq M] [--min-qual Q]
+    python cli.py coverage FILE CHROM [--processes N]
+
+Формат определяется по расширению файла (.fa/.fasta/.fna, .fq/.fastq,
+.sam, .tsb – бинарный формат SamBinaryWriter, .vcf).
+
+Модули ридеров и тяжёлые зависимости импортируются только внутри
+команд, которым они нужны, поэтому запуск для одного небольшого файла
+почти ничего не стоит. Бюджет времени импорта проверяет
+check_import_time.py.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+_FORMATS = {
+    ".fa": "fasta",
+    ".fasta": "fasta",
+    ".fna": "fasta",
+    ".fq": "fastq",
+    ".fastq": "fastq",
+    ".sam": "sam",
+    ".tsb": "sam",
+    ".vcf": "vcf",
+}
+
+
+def _detect_format(filename: str) -> str:
+    ext = os.path.splitext(filename)[1].lower()
+    if ext not in _FORMATS:
+        raise SystemExit(f"Неизвестный формат файла: {filename}")
+    return _FORMATS[ext]
+
+
+def _open_reader(filename: str) -> Any:
+    """
+    Создать ридер по расширению файла, импортировав только его модуль.
+    """
+    fmt = _detect_format(filename)
+    if fmt == "fasta":
+        from FastaReader import FastaReader
+        return FastaReader(filename)
+    if fmt == "fastq":
+        from FastqReader import FastqReader
+        return FastqReader(filename)
+    if fmt == "sam":
+        if filename.lower().endswith(".tsb"):
+            from SamBinaryReader import SamBinaryReader
+            return SamBinaryReader(filename)
+        from SamReader import SamReader
+        return SamReader(filename)
+    from VcfReader import VcfReader
+    return VcfReader(filename)
+
+
+def _parse_region(region: str) -> Tuple[str, Optional[int], Optional[int]]:
+    """
+    Разобрать регион вида 'chr1', 'chr1:10' или 'chr1:10-30'.
+    """
+    if ":" not in region:
+        return region, None, None
+    chrom, span = region.rsplit(":", 1)
+    start, dash, end = span.partition("-")
+    if not chrom or not start.isdigit() or (dash and not end.isdigit()):
+        raise SystemExit(
+            f"Некорректный регион: {region} (ожидается CHROM[:START[-END]])"
+        )
+    return chrom, int(start), int(end) if end else None
+
+
+def _mean(values: Sequence[int]) -> float:
+    return sum(values) / len(values) if values else 0.0
+
+
+def _executor(reader: Any, processes: int) -> Any:
+    from ParallelExecutor import ParallelExecutor
+    return ParallelExecutor(reader, processes=processes)
+
+
+# ---------- Вывод записей ----------
+
+def _format_alignment(aln: Dict[str, Any]) -> str:
+    fields = [
+        aln["QNAME"], aln["FLAG"], aln["RNAME"], aln["POS"], aln["MAPQ"],
+        aln["CIGAR"], aln["RNEXT"], aln["PNEXT"], aln["TLEN"], aln["SEQ"],
+        aln["QUAL"], *aln["TAGS"],
+    ]
+    return "\t".join(str(field) for field in fields)
+
+
+def _format_variant(var: Dict[str, Any]) -> str:
+    """
+    Собрать полную строку VCF из словаря VcfReader: INFO, FORMAT
+    и поля образцов в порядке колонок.
+    """
+    qual = var["QUAL"]
+    if qual is None:
+        qual_str = "."
+    elif qual.is_integer():
+        qual_str = str(int(qual))
+    else:
+        qual_str = repr(qual)
+
+    info_items = [
+        key if value is True else f"{key}={value}"
+        for key, value in var["INFO"].items()
+    ]
+    fields = [
+        var["CHROM"],
+        str(var["POS"]),
+        var["ID"],
+        var["REF"],
+        ",".join(var["ALT"]) or ".",
+        qual_str,
+        var["FILTER"],
+        ";".join(info_items) or ".",
+    ]
+    format_keys: List[str] = var["FORMAT"]
+    if format_keys:
+        fields.append(":".join(format_keys))
+        for sample in var["SAMPLES"].values():
+            fields.append(":".join(sample[key] for key in format_keys if key in sample))
+    return "\t".join(fields)
+
+
+def _write_records(fmt: str, records: Iterable[Any]) -> None:
+    out = sys.stdout
+    for record in records:
+        if fmt == "fasta":
+            seq_id, sequence = record
+            out.write(f">{seq_id}\n{sequence}\n")
+        elif fmt == "fastq":
+            quality = "".join(chr(score + 33) for score in record["quality"])
+            out.write(f"@{record['id']}\n{record['sequence']}\n+\n{quality}\n")
+        elif fmt == "sam":
+            out.write(_format_alignment(record) + "\n")
+        else:
+            out.write(_format_variant(record) + "\n")
+
+
+# ---------- Команды ----------
+
+def cmd_stats(args: argparse.Namespace) -> int:
+    fmt = _detect_format(args.file)
+    reader = _open_reader(args.file)
+
+    if fmt in ("fasta", "fastq"):
+        count = 0
+        total_len = 0
+        total_qual = 0.0
+        for record in reader.read():
+            count += 1
+            if fmt == "fasta":
+                total_len += len(record[1])
+            else:
+                total_len += len(record["sequence"])
+                total_qual += _mean(record["quality"])
+        print(f"records\t{count}")
+        print(f"total_length\t{total_len}")
+        print(f"mean_length\t{total_len / count if count else 0:.2f}")
+        if fmt == "fastq":
+            print(f"mean_quality\t{total_qual / count if count else 0:.2f}")
+        return 0
+
+    # невыровненные прочтения SAM попадают в отдельную строку '*'
+    if args.processes > 1:
+        counts = _executor(reader, args.processes).count_by_chromosome(
+            include_unmapped=True
+        )
+    else:
+        from ParallelExecutor import count_by_chromosome
+        counts = count_by_chromosome(reader.read(), include_unmapped=True)
+    print(f"records\t{sum(counts.values())}")
+    for chrom in sorted(counts):
+        print(f"{chrom}\t{counts[chrom]}")
+    return 0
+
+
+def cmd_fetch(args: argparse.Namespace) -> int:
+    fmt = _detect_format(args.file)
+    reader = _open_reader(args.file)
+
+    if fmt == "fasta":
+        records: Iterable[Any] = (
+            rec for rec in reader.read() if rec[0] == args.target
+        )
+    elif fmt == "fastq":
+        records = (rec for rec in reader.read() if rec["id"] == args.target)
+    else:
+        chrom, start, end = _parse_region(args.target)
+        key = "RNAME" if fmt == "sam" else "CHROM"
+        source = reader.fetch(chrom) if hasattr(reader, "fetch") else reader.read()
+        records = (
+            rec for rec in source
+            if rec[key] == chrom
+            and (start is None or rec["POS"] >= start)
+            and (end is None or rec["POS"] <= end)
+        )
+    _write_records(fmt, records)
+    return 0
+
+
+def cmd_filter(args: argparse.Namespace) -> int:
+    fmt = _detect_format(args.file)
+    reader = _open_reader(args.file)
+
+    if fmt == "fasta":
+        records: Iterable[Any] = (
+            rec for rec in reader.read() if len(rec[1]) >= args.min_length
+        )
+    elif fmt == "fastq":
+        records = (
+            rec for rec in reader.read()
+            if len(rec["sequence"]) >= args.min_length
+            and _mean(rec["quality"]) >= args.min_quality
+        )
+    elif fmt == "sam":
+        records = (
+            aln for aln in reader.read()
+            if (args.flag is None or aln["FLAG"] == args.flag)
+            and aln["MAPQ"] >= args.min_mapq
+        )
+    else:
+        records = (
+            var for var in reader.read()
+            if var["QUAL"] is not None and var["QUAL"] >= args.min_qual
+        )
+    _write_records(fmt, records)
+    return 0
+
+
+def cmd_coverage(args: argparse.Namespace) -> int:
+    if _detect_format(args.file) != "sam":
+        raise SystemExit("Покрытие считается только для SAM")
+    reader = _open_reader(args.file)
+    if args.processes > 1:
+        coverage = _executor(reader, args.processes).calculate_coverage(args.chrom)
+    else:
+        coverage = reader.calculate_coverage(args.chrom)
+    for pos in sorted(coverage):
+        print(f"{args.chrom}\t{pos}\t{coverage[pos]}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="cli.py",
+        description="Статистика, выборка и фильтрация FASTA/FASTQ/SAM/VCF.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    stats = sub.add_parser("stats", help="сводная статистика файла")
+    stats.add_argument("file")
+    stats.add_argument("--processes", type=int, default=1,
+                       help="число процессов для SAM/VCF")
+    stats.set_defaults(func=cmd_stats)
+
+    fetch = sub.add_parser("fetch", help="выборка записей")
+    fetch.add_argument("file")
+    fetch.add_argument("target",
+                       help="ID последовательности или регион CHROM[:START[-END]]")
+    fetch.set_defaults(func=cmd_fetch)
+
+    flt = sub.add_parser("filter", help="фильтрация записей")
+    flt.add_argument("file")
+    flt.add_argument("--min-length", type=int, default=0,
+                     help="FASTA/FASTQ: минимальная длина")
+    flt.add_argument("--min-quality", type=float, default=0.0,
+                     help="FASTQ: минимальное среднее качество")
+    flt.add_argument("--flag", type=int, default=None,
+                     help="SAM: точное значение FLAG")
+    flt.add_argument("--min-mapq", type=int, default=0,
+                     help="SAM: минимальное MAPQ")
+    flt.add_argument("--min-qual", type=float, default=0.0,
+                     help="VCF: минимальное QUAL")
+    flt.set_defaults(func=cmd_filter)
+
+    cov = sub.add_parser("coverage", help="покрытие хромосомы (SAM)")
+    cov.add_argument("file")
+    cov.add_argument("chrom")
+    cov.add_argument("--processes", type=int, default=1)
+    cov.set_defaults(func=cmd_coverage)
+
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not os.path.isfile(args.file):
+        parser.error(f"файл не найден: {args.file}")
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,9 +4,11 @@ from FastaReader import FastaReader
 from FastqReader import FastqReader
 from SamReader import SamReader
 from VcfReader import VcfReader
+from ParallelExecutor import ParallelExecutor
+from VariantPileup import VariantPileup
 
-import pandas as pd
-import matplotlib.pyplot as plt
+# pandas и matplotlib импортируются внутри демонстраций, которым они
+# нужны: запуск только для FASTA не должен платить за их загрузку.
 
 
 DATA_DIR = "data"
@@ -50,6 +52,8 @@ def demo_fastq():
 
     # Per-base sequence quality: среднее качество по каждой позиции
     if records:
+        import matplotlib.pyplot as plt
+
         max_len = max(len(r["quality"]) for r in records)
         per_base_q = []
         positions = list(range(1, max_len + 1))
@@ -74,6 +78,8 @@ def demo_fastq():
 
     # Распределение длины прочтений
     if lengths:
+        import matplotlib.pyplot as plt
+
         plt.figure()
         plt.hist(lengths, bins=range(1, max(lengths) + 2))
         plt.xlabel("Длина прочтения")
@@ -87,6 +93,8 @@ def demo_fastq():
 
 def demo_sam():
     print("=== SAM ===")
+    import pandas as pd
+
     sam_path = f"{DATA_DIR}/test.sam"
     reader = SamReader(sam_path)
 
@@ -125,6 +133,8 @@ def demo_sam():
 
 def demo_vcf():
     print("=== VCF ===")
+    import pandas as pd
+
     vcf_path = f"{DATA_DIR}/test.vcf"
     reader = VcfReader(vcf_path)
 
@@ -164,13 +174,43 @@ def demo_vcf():
     print()
 
 
+def demo_parallel():
+    print("=== Параллельный map-reduce ===")
+    sam_executor = ParallelExecutor(SamReader(f"{DATA_DIR}/test.sam"))
+    print("Выравнивания по хромосомам:", sam_executor.count_by_chromosome())
+    print("Покрытие chr1:", sam_executor.calculate_coverage("chr1"))
+
+    vcf_executor = ParallelExecutor(VcfReader(f"{DATA_DIR}/test.vcf"))
+    print("Варианты по хромосомам:", vcf_executor.count_by_chromosome())
+    passed = vcf_executor.filter_by_quality(30)
+    print("Варианты с QUAL >= 30:", [var["ID"] for var in passed])
+    print()
+
+
+def demo_pileup():
+    print("=== Пайлап по позициям вариантов ===")
+    pileup = VariantPileup(
+        VcfReader(f"{DATA_DIR}/test.vcf"),
+        SamReader(f"{DATA_DIR}/test.sam"),
+    )
+    for site in pileup.pileup():
+        print(
+            f"{site['CHROM']}:{site['POS']} {site['REF']}>{','.join(site['ALT'])} "
+            f"depth={site['DEPTH']} ref={site['REF_COUNT']} "
+            f"alt={site['ALT_COUNTS']} other={site['OTHER_COUNT']}"
+        )
+    print()
+
+
 def main():
     demo_fasta()
     demo_fastq()
     demo_sam()
     demo_vcf()
+    demo_parallel()
+    demo_pileup()
 
 
 if __name__ == "__main__":
-    # Просто запускаем демонстрацию без какого-либо CLI.
+    # Просто запускаем демонстрацию; командная строка – в cli.py.
     main()
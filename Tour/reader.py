@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Iterator, Any
+from typing import Iterator, Any, Optional
 
 
 class Reader(ABC):
@@ -27,18 +27,51 @@ class Reader(ABC):
 
         Возвращает итератор по объектам "Record" (тип задаётся наследниками).
         """
-        with open(self._filename, "r", encoding="utf-8") as handle:
-            for line in handle:
-                line = line.rstrip("\n")
-                record = self._parse_line(line)
-                if record is not None:
-                    yield record
+        for line in self._iter_lines(0, None):
+            record = self._parse_line(line)
+            if record is not None:
+                yield record
+
+    def read_range(self, start: int, end: int) -> Iterator[Any]:
+        """
+        Генератор по записям, строки которых начинаются в диапазоне
+        байтов [start, end).
+
+        Если start попадает в середину строки, эта строка пропускается –
+        её прочитает диапазон, в котором она начинается. Благодаря этому
+        набор смежных диапазонов покрывает каждую строку ровно один раз.
+        """
+        for line in self._iter_lines(start, end):
+            record = self._parse_line(line)
+            if record is not None:
+                yield record
+
+    def _iter_lines(self, start: int, end: Optional[int]) -> Iterator[str]:
+        """
+        Строки файла, начинающиеся в диапазоне байтов [start, end)
+        (end=None – до конца файла), без символов конца строки.
+
+        Общий источник строк для read() и read_range(): окончания
+        '\n' и '\r\n' обрабатываются одинаково в обоих случаях.
+        """
+        with open(self._filename, "rb") as handle:
+            offset = start
+            if start > 0:
+                handle.seek(start - 1)
+                offset = start - 1 + len(handle.readline())
+            for raw in handle:
+                if end is not None and offset >= end:
+                    break
+                offset += len(raw)
+                if raw.endswith(b"\n"):
+                    raw = raw[:-2] if raw.endswith(b"\r\n") else raw[:-1]
+                yield raw.decode("utf-8")
 
     def close(self) -> None:
         """
         Метод оставлен для соответствия UML-диаграмме.
         В текущей реализации файловый дескриптор всегда
-        закрывается контекстным менеджером в read().
+        закрывается контекстным менеджером при чтении.
         """
         # Ничего не делаем, т.к. файл открывается в контекстном менеджере.
         return None
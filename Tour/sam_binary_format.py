@@ -0,0 +1,125 @@
+# sam_binary_format.py
+"""
+Общие константы и кодеки компактного бинарного формата выравниваний
+(используются SamBinaryWriter и SamBinaryReader).
+
+Структура файла (все числа little-endian):
+
+    MAGIC                         4 байта
+    u8  compressed                1, если блоки сжаты zlib
+    u32 header_len + header       текст SAM-заголовка в utf-8
+    блоки записей                 u32 raw_len, u32 stored_len, payload
+    индекс                        словарь референсов и таблица блоков
+    u64 index_offset + MAGIC      трейлер
+
+Блок хранит записи по колонкам, чтобы читатель декодировал каждую
+колонку одной операцией на весь блок, а не отдельно для каждой записи:
+
+    u32 n_records
+    n_records * RECORD            фиксированные поля
+    u32 len + QNAME               имена через '\n'
+    u32 len + CIGAR               u32 на операцию: длина << 4 | код
+    u32 len + SEQ                 4 бита на основание, каждая
+                                  последовательность дополнена до чётной длины
+    u32 len + QUAL                сырые строки качества через '\n'
+    u32 len + TAGS                теги записи через '\t', записи через '\n'
+"""
+from __future__ import annotations
+
+import struct
+from typing import List
+
+from SamReader import SamReader
+
+MAGIC = b"TSB\x03"
+
+# compressed
+FILE_HEADER = struct.Struct("<B")
+# header_len
+U32 = struct.Struct("<I")
+# index_offset
+U64 = struct.Struct("<Q")
+# raw_len, stored_len
+BLOCK_HEADER = struct.Struct("<II")
+# offset, n_records, min_ref_id, max_ref_id
+BLOCK_INDEX_ENTRY = struct.Struct("<QIii")
+# FLAG, ref_id, POS, MAPQ, next_ref_id, PNEXT, TLEN, n_cigar, len(SEQ)
+RECORD = struct.Struct("<HiiBiiiII")
+
+# Поля словаря-выравнивания SamReader в порядке колонок SAM
+FIELDS = (
+    "QNAME", "FLAG", "RNAME", "POS", "MAPQ", "CIGAR",
+    "RNEXT", "PNEXT", "TLEN", "SEQ", "QUAL", "TAGS",
+)
+# поле -> номер в кортеже RECORD (только поля из фиксированной части)
+FIXED_COLUMNS = {
+    "FLAG": 0, "RNAME": 1, "POS": 2, "MAPQ": 3,
+    "RNEXT": 4, "PNEXT": 5, "TLEN": 6,
+}
+
+# Специальные значения ref_id для RNAME/RNEXT. Выбраны так, чтобы
+# список refs + ["=", "*"] переводил любой ref_id в имя обычной индексацией.
+REF_NONE = -1    # '*'
+REF_SAME = -2    # '=' (только RNEXT)
+
+CIGAR_OPS = "MIDNSHP=X"
+_CIGAR_CODES = {op: code for code, op in enumerate(CIGAR_OPS)}
+
+SEQ_ALPHABET = "=ACMGRSVTWYHKDBN"
+
+# символ -> 4-битный код; неизвестные символы кодируются как N
+_SEQ_ENCODE = bytearray([SEQ_ALPHABET.index("N")] * 256)
+for _code, _base in enumerate(SEQ_ALPHABET):
+    _SEQ_ENCODE[ord(_base)] = _code
+    _SEQ_ENCODE[ord(_base.lower())] = _code
+_SEQ_ENCODE = bytes(_SEQ_ENCODE)
+# код -> тот же код в старшем полубайте
+_SEQ_SHIFT = bytes((code << 4) & 0xFF for code in range(256))
+# упакованный байт -> символ старшего / младшего полубайта
+_SEQ_HIGH = bytes(ord(SEQ_ALPHABET[byte >> 4]) for byte in range(256))
+_SEQ_LOW = bytes(ord(SEQ_ALPHABET[byte & 0x0F]) for byte in range(256))
+
+
+def encode_cigar(cigar: str) -> List[int]:
+    """
+    Преобразовать строку CIGAR в список упакованных операций.
+    '*' кодируется пустым списком.
+    """
+    return [(length << 4) | _CIGAR_CODES[op] for length, op in SamReader.parse_cigar(cigar)]
+
+
+def decode_cigar(packed: tuple) -> str:
+    """
+    Обратное преобразование к encode_cigar.
+    """
+    if not packed:
+        return "*"
+    return "".join(f"{value >> 4}{CIGAR_OPS[value & 0x0F]}" for value in packed)
+
+
+def encode_seq(seq: str) -> bytes:
+    """
+    Упаковать последовательность по 2 основания в байт.
+
+    Регистр не сохраняется, символы вне алфавита SEQ_ALPHABET
+    превращаются в N. Упаковка сделана через translate и длинную
+    арифметику, чтобы не перебирать основания в цикле Python.
+    """
+    codes = seq.encode("ascii").translate(_SEQ_ENCODE)
+    high = codes[0::2].translate(_SEQ_SHIFT)
+    low = codes[1::2]
+    if len(low) < len(high):
+        low += b"\x00"
+    size = len(high)
+    value = int.from_bytes(high, "big") | int.from_bytes(low, "big")
+    return value.to_bytes(size, "big")
+
+
+def decode_seq(packed: bytes, length: int) -> str:
+    """
+    Распаковать последовательность длины length.
+    """
+    out = bytearray(len(packed) * 2)
+    out[0::2] = packed.translate(_SEQ_HIGH)
+    out[1::2] = packed.translate(_SEQ_LOW)
+    return out[:length].decode("ascii")